@@ -50,7 +50,7 @@ setup(
         "Natural Language :: English",
     ],
     install_requires=[
-        "deepdiff",
+        "orjson",
         "pydantic",
         "pypika",
         "pymysql",
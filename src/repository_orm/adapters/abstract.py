@@ -1,7 +1,21 @@
 """Define the interface of the repositories."""
 
 import abc
-from typing import Dict, List, Optional, Type, TypeVar, Union
+import re
+from operator import attrgetter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from ..exceptions import AutoIncrementError, EntityNotFoundError
 from ..model import Entity as EntityModel
@@ -14,6 +28,10 @@ Models = List[Type[Entity]]
 OptionalModels = Optional[Models[Entity]]
 OptionalModelOrModels = Optional[Union[Type[Entity], Models[Entity]]]
 
+_ID = attrgetter("id_")
+# Value of the attributes that an entity doesn't have.
+_MISSING = object()
+
 
 class Repository(abc.ABC):
     """Gather common methods and define the interface of the repositories.
@@ -49,6 +67,17 @@ class Repository(abc.ABC):
             entity.id_ = self._next_id(entity)  # pragma: no cover
         raise NotImplementedError
 
+    def add_many(self, entities: Iterable[Entity]) -> None:
+        """Append several entities to the repository.
+
+        Repositories that can persist the entities in bulk override it.
+
+        Args:
+            entities: Entities to add to the repository.
+        """
+        for entity in entities:
+            self.add(entity)
+
     @abc.abstractmethod
     def delete(self, entity: Entity) -> None:
         """Delete an entity from the repository.
@@ -58,6 +87,20 @@ class Repository(abc.ABC):
         """
         raise NotImplementedError
 
+    def delete_many(self, entities: Iterable[Entity]) -> None:
+        """Delete several entities from the repository.
+
+        Repositories that can delete the entities in bulk override it.
+
+        Args:
+            entities: Entities to remove from the repository.
+
+        Raises:
+            EntityNotFoundError: If any of the entities is not found.
+        """
+        for entity in entities:
+            self.delete(entity)
+
     @abc.abstractmethod
     def get(
         self, id_: EntityID, models: OptionalModelOrModels[Entity] = None
@@ -121,6 +164,41 @@ class Repository(abc.ABC):
         """
         raise NotImplementedError
 
+    def iter_all(
+        self, models: OptionalModelOrModels[Entity] = None
+    ) -> Iterator[Entity]:
+        """Iterate over the entities of the repository whose class is in models.
+
+        Repositories that need to build the entities from the stored data build
+        each of them when it's requested, so you don't pay for the ones you don't
+        use.
+
+        Args:
+            models: Entity class or classes to obtain.
+        """
+        yield from self.all(models)
+
+    def iter_search(
+        self,
+        fields: Dict[str, EntityID],
+        models: OptionalModelOrModels[Entity] = None,
+    ) -> Iterator[Entity]:
+        """Iterate over the entities whose attributes match one or several conditions.
+
+        Repositories that need to build the entities from the stored data build
+        each of them when it's requested, so you don't pay for the ones you don't
+        use.
+
+        Args:
+            models: Entity class or classes to obtain.
+            fields: Dictionary with the {key}:{value} to search.
+
+        Raises:
+            EntityNotFoundError: When requesting the first entity if no entity
+                matches the conditions.
+        """
+        yield from self.search(fields, models)
+
     def last(self, models: OptionalModelOrModels[Entity] = None) -> Entity:
         """Get the biggest entity from the repository.
 
@@ -134,7 +212,7 @@ class Repository(abc.ABC):
             EntityNotFoundError: If there are no entities.
         """
         try:
-            return max(self.all(models))
+            return max(self.all(models), key=_ID)
         except ValueError as error:
             # no cover: it's tested by it's subclasses
             models = self._build_models(models)  # pragma: nocover
@@ -153,7 +231,7 @@ class Repository(abc.ABC):
             EntityNotFoundError: If there are no entities.
         """
         try:
-            return min(self.all(models))
+            return min(self.all(models), key=_ID)
         except ValueError as error:
             models = self._build_models(models)  # pragma: nocover
             raise self._model_not_found(models) from error  # pragma: nocover
@@ -203,6 +281,20 @@ class Repository(abc.ABC):
             f"There are no {models[0].__name__}s in the repository{append_str}."
         )
 
+    @staticmethod
+    def _build_search_conditions(
+        fields: Dict[str, EntityID],
+    ) -> List[Tuple[str, Callable[[Any], bool]]]:
+        """Build the tests that the entity attributes need to pass to match a search.
+
+        Args:
+            fields: Dictionary with the {key}:{value} to search.
+
+        Returns:
+            List of the attribute names and the test their values need to pass.
+        """
+        return [(key, _build_condition(value)) for key, value in fields.items()]
+
     def _build_models(self, models: OptionalModelOrModels[Entity]) -> Models[Entity]:
         """Create the Models from the OptionalModelOrModels."""
         if models is None:
@@ -210,3 +302,32 @@ class Repository(abc.ABC):
         elif not isinstance(models, list):
             models = [models]
         return models
+
+
+def _build_condition(value: Any) -> Callable[[Any], bool]:
+    """Build the test that an entity attribute needs to pass to match a value.
+
+    String values are treated as regular expressions, compiled once per search,
+    and matched against the attribute if it's a string or against its elements if
+    it's a list. The rest of the values are compared by equality.
+
+    Args:
+        value: Value to search.
+    """
+    if not isinstance(value, str):
+        return lambda attribute: bool(attribute == value)
+
+    regexp = re.compile(value)
+
+    def condition(attribute: Any) -> bool:
+        if isinstance(attribute, str):
+            return regexp.search(attribute) is not None
+        if isinstance(attribute, list):
+            return any(
+                regexp.search(element) is not None
+                for element in attribute
+                if isinstance(element, str)
+            )
+        return bool(attribute == value)
+
+    return condition
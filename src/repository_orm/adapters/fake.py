@@ -1,21 +1,32 @@
 """Store the fake repository implementation."""
 
-import copy
-import re
+import heapq
 from contextlib import suppress
-from typing import Dict, List, Type
-
-from deepdiff import extract, grep
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Type
 
 from ..exceptions import EntityNotFoundError, TooManyEntitiesError
 from ..model import EntityID
-from .abstract import Entity, Models, OptionalModelOrModels, OptionalModels, Repository
+from .abstract import (
+    _ID,
+    _MISSING,
+    Entity,
+    Models,
+    OptionalModelOrModels,
+    OptionalModels,
+    Repository,
+)
 
 FakeRepositoryDB = Dict[Type[Entity], Dict[EntityID, Entity]]
+FakeRepositoryIndex = Dict[Type[Entity], Dict[str, Dict[Any, Dict[EntityID, Entity]]]]
 
 
 class FakeRepository(Repository):
-    """Implement the repository pattern using a memory dictionary."""
+    """Implement the repository pattern using a memory dictionary.
+
+    The repository stores and returns deep copies of the entities, so changing an
+    entity or its lists and dictionaries doesn't change the repository until it's
+    added and committed, as it happens with the other repositories.
+    """
 
     def __init__(
         self, models: OptionalModels[Entity] = None, database_url: str = ""
@@ -26,6 +37,10 @@ class FakeRepository(Repository):
             raise ConnectionError(f"Could not create database file: {database_url}")
         self.entities: FakeRepositoryDB[Entity] = {}
         self.new_entities: FakeRepositoryDB[Entity] = {}
+        self._indexes: FakeRepositoryIndex[Entity] = {}
+        self._sorted: Dict[Type[Entity], List[Entity]] = {}
+        self._changed_ids: Dict[Type[Entity], Set[EntityID]] = {}
+        self._cached_sizes: Dict[Type[Entity], int] = {}
 
     def add(self, entity: Entity) -> None:
         """Append an entity to the repository.
@@ -35,14 +50,7 @@ class FakeRepository(Repository):
         """
         if isinstance(entity.id_, int) and entity.id_ < 0:
             entity.id_ = self._next_id(entity)
-        if self.new_entities == {}:
-            self.new_entities = copy.deepcopy(self.entities.copy())
-        try:
-            self.new_entities[type(entity)]
-        except KeyError:
-            self.new_entities[type(entity)] = {}
-
-        self.new_entities[type(entity)][entity.id_] = entity
+        self._stage(entity)[entity.id_] = entity.copy(deep=True)
 
     def delete(self, entity: Entity) -> None:
         """Delete an entity from the repository.
@@ -53,14 +61,27 @@ class FakeRepository(Repository):
         Raises:
             EntityNotFoundError: If the entity is not found.
         """
-        if self.new_entities == {}:
-            self.new_entities = copy.deepcopy(self.entities.copy())
-        try:
-            self.new_entities[type(entity)].pop(entity.id_, None)
-        except KeyError as error:
+        model = type(entity)
+        if model not in self.entities and model not in self.new_entities:
             raise EntityNotFoundError(
                 f"Unable to delete entity {entity} because it's not in the repository"
-            ) from error
+            )
+        self._stage(entity).pop(entity.id_, None)
+
+    def _stage(self, entity: Entity) -> Dict[EntityID, Entity]:
+        """Return the staged entities of the model of an entity we're changing.
+
+        The first time a model is changed after a commit, the dictionary of its
+        stored entities is copied, so the changes are not visible until the commit.
+
+        Args:
+            entity: Entity that is going to be added or deleted.
+        """
+        model = type(entity)
+        self._changed_ids.setdefault(model, set()).add(entity.id_)
+        if model not in self.new_entities:
+            self.new_entities[model] = self.entities.get(model, {}).copy()
+        return self.new_entities[model]
 
     def get(
         self, id_: EntityID, models: OptionalModelOrModels[Entity] = None
@@ -82,11 +103,12 @@ class FakeRepository(Repository):
         models = self._build_models(models)
 
         for model in models:
-            with suppress(KeyError):
-                matching_entities.append(self.entities[model][id_])
+            entity = self.entities.get(model, {}).get(id_)
+            if entity is not None:
+                matching_entities.append(entity)
 
         if len(matching_entities) == 1:
-            return matching_entities[0]
+            return matching_entities[0].copy(deep=True)
         elif len(matching_entities) == 0:
             raise self._model_not_found(models, f" with id {id_}")
         else:
@@ -100,23 +122,106 @@ class FakeRepository(Repository):
         Args:
             models: Entity class or classes to obtain.
         """
-        entities = []
-        models = self._build_models(models)
+        return list(self.iter_all(models))
 
-        for model in models:
-            with suppress(KeyError):
-                entities += sorted(
-                    entity for entity_id, entity in self.entities[model].items()
-                )
+    def iter_all(
+        self, models: OptionalModelOrModels[Entity] = None
+    ) -> Iterator[Entity]:
+        """Iterate over the entities of the repository whose class is in models.
 
-        return entities
+        The entities are taken directly from the sorted entities of each model, so
+        no intermediate list is built.
+
+        Args:
+            models: Entity class or classes to obtain.
+        """
+        for model in self._build_models(models):
+            try:
+                entities = self._sorted_entities(model)
+            except KeyError:
+                continue
+            for entity in entities:
+                yield entity.copy(deep=True)
+
+    def _sorted_entities(self, model: Type[Entity]) -> List[Entity]:
+        """Return the stored entities of a model sorted by their id_.
+
+        The list is built the first time it's needed and updated when a commit
+        changes the entities of the model.
+
+        Args:
+            model: Entity class to obtain.
+
+        Raises:
+            KeyError: If there are no entities of the model.
+        """
+        self._check_caches(model)
+        try:
+            return self._sorted[model]
+        except KeyError:
+            sorted_entities = sorted(self.entities[model].values(), key=_ID)
+            self._sorted[model] = sorted_entities
+            return sorted_entities
+
+    def _check_caches(self, model: Type[Entity]) -> None:
+        """Drop the sorted entities and indexes of a model if they're outdated.
+
+        The entities attribute can be changed directly, for example by the tests, so
+        the caches are dropped if the number of stored entities has changed since
+        they were built.
+
+        Args:
+            model: Entity class whose caches we want to use.
+        """
+        size = len(self.entities.get(model, {}))
+        if self._cached_sizes.get(model) != size:
+            self._sorted.pop(model, None)
+            self._indexes.pop(model, None)
+            self._cached_sizes[model] = size
 
     def commit(self) -> None:
         """Persist the changes into the repository."""
-        for model, entities in self.new_entities.items():
-            self.entities[model] = entities
+        for model in self.new_entities:
+            self._check_caches(model)
+        self.entities.update(self.new_entities)
+        for model in self.new_entities:
+            self._indexes.pop(model, None)
+            self._update_sorted_entities(model, self._changed_ids.pop(model, None))
+            self._cached_sizes[model] = len(self.entities[model])
         self.new_entities = {}
 
+    def _update_sorted_entities(
+        self, model: Type[Entity], changed_ids: Optional[Set[EntityID]]
+    ) -> None:
+        """Update the sorted entities of a model with the committed changes.
+
+        Instead of sorting all the entities again, the changed entities are sorted
+        and merged with the untouched ones.
+
+        Args:
+            model: Entity class whose entities have been committed.
+            changed_ids: ids of the entities added or deleted since the last commit.
+        """
+        if model not in self._sorted:
+            return
+        if changed_ids is None:
+            del self._sorted[model]
+            return
+        entities = self.entities[model]
+        self._sorted[model] = list(
+            heapq.merge(
+                [
+                    entity
+                    for entity in self._sorted[model]
+                    if entity.id_ not in changed_ids
+                ],
+                sorted(
+                    (entities[id_] for id_ in changed_ids if id_ in entities), key=_ID
+                ),
+                key=_ID,
+            )
+        )
+
     def search(
         self,
         fields: Dict[str, EntityID],
@@ -134,45 +239,93 @@ class FakeRepository(Repository):
         Raises:
             EntityNotFoundError: If the entities are not found.
         """
+        entities = []
         models = self._build_models(models)
-        all_entities: List[Entity] = self.all(models)
-        entities_dict = {entity.id_: entity for entity in all_entities}
-        entity_attributes = {entity.id_: entity.dict() for entity in all_entities}
+        conditions = self._build_search_conditions(fields)
 
-        for key, value in fields.items():
-            # Get entities that have the value `value`
-            entities_with_value = entity_attributes | grep(
-                str(value), use_regexp=True, strict_checking=False
-            )
-            matching_entity_attributes = {}
+        for model in models:
+            with suppress(KeyError):
+                entities += sorted(
+                    (
+                        entity.copy(deep=True)
+                        for entity in self._search_candidates(model, fields)
+                        if all(
+                            condition(getattr(entity, key, _MISSING))
+                            for key, condition in conditions
+                        )
+                    ),
+                    key=_ID,
+                )
 
-            try:
-                entities_with_value["matched_values"]
-            except KeyError as error:
-                raise self._model_not_found(
-                    models, f" that match the search filter {fields}"
-                ) from error
-
-            for path in entities_with_value["matched_values"]:
-                entity_id = re.sub(r"root\[(.*?)\]\[.*", r"\1", path)
-
-                # Convert int ids from str to int
-                try:
-                    entity_id = int(entity_id)
-                except ValueError:
-                    entity_id = re.sub(r"'(.*)'", r"\1", entity_id)
-
-                # Add the entity to the matching ones only if the value is of the
-                # attribute `key`.
-                if re.match(fr"root\['?{entity_id}'?\]\['{key}'\]", path):
-                    matching_entity_attributes[entity_id] = extract(
-                        entity_attributes, f"root[{entity_id}]"
-                    )
-            entity_attributes = matching_entity_attributes
-        entities = [entities_dict[key] for key in entity_attributes.keys()]
+        if len(entities) == 0:
+            raise self._model_not_found(
+                models, f" that match the search filter {fields}"
+            )
 
         return entities
 
+    def _search_candidates(
+        self, model: Type[Entity], fields: Dict[str, EntityID]
+    ) -> Iterable[Entity]:
+        """Return the entities of a model that may match the search fields.
+
+        If any of the fields is searched by equality, use the field indexes to get the
+        entities that have all those values, otherwise return all the entities.
+
+        Args:
+            model: Entity class to search.
+            fields: Dictionary with the {key}:{value} to search.
+
+        Raises:
+            KeyError: If there are no entities of the model.
+        """
+        entities = self.entities[model]
+        index_entries = []
+        for key, value in fields.items():
+            if isinstance(value, str):
+                continue
+            with suppress(TypeError):
+                index_entries.append(self._field_index(model, key).get(value, {}))
+        if len(index_entries) == 0:
+            return entities.values()
+
+        # Start with the smallest entry so the candidates shrink as soon as possible.
+        index_entries.sort(key=len)
+        candidates = index_entries[0]
+        for matching_entities in index_entries[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = {
+                id_: entity
+                for id_, entity in candidates.items()
+                if id_ in matching_entities
+            }
+        return candidates.values()
+
+    def _field_index(
+        self, model: Type[Entity], field: str
+    ) -> Dict[Any, Dict[EntityID, Entity]]:
+        """Return the index of the entities of a model by the value of a field.
+
+        The index is built the first time it's needed and discarded on each commit.
+        Entities whose field value is not hashable are left out of the index.
+
+        Args:
+            model: Entity class to index.
+            field: Name of the attribute to index.
+        """
+        self._check_caches(model)
+        model_indexes = self._indexes.setdefault(model, {})
+        try:
+            return model_indexes[field]
+        except KeyError:
+            index: Dict[Any, Dict[EntityID, Entity]] = {}
+            for id_, entity in self.entities[model].items():
+                with suppress(TypeError):
+                    index.setdefault(getattr(entity, field, _MISSING), {})[id_] = entity
+            model_indexes[field] = index
+            return index
+
     def apply_migrations(self, migrations_directory: str) -> None:
         """Run the migrations of the repository schema.
 
@@ -200,20 +353,20 @@ class FakeRepository(Repository):
             models = self._build_models(models)
             try:
                 # Empty repo but entities staged to be commited.
-                return max(self._staged_entities(models))
+                return max(self._staged_entities(models), key=_ID).copy(deep=True)
             except KeyError as no_staged_entities:
                 # Empty repo and no entities staged.
                 raise empty_repo from no_staged_entities
 
         try:
             models = self._build_models(models)
-            last_staged_entity: Entity = max(self._staged_entities(models))
+            last_staged_entity: Entity = max(self._staged_entities(models), key=_ID)
         except KeyError:
             # Full repo and no staged entities.
             return last_index_entity
 
         # Full repo and staged entities.
-        return max([last_index_entity, last_staged_entity])
+        return max([last_index_entity, last_staged_entity], key=_ID).copy(deep=True)
 
     def _staged_entities(self, models: Models[Entity]) -> List[Entity]:
         """Return a list of staged entities of type models.
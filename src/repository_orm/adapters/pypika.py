@@ -4,20 +4,52 @@ import logging
 import os
 import re
 import sqlite3
+import uuid
 from contextlib import suppress
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
 from sqlite3 import OperationalError
-from typing import Dict, List, Type, Union
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 from pypika import Query, Table
 from yoyo import get_backend, read_migrations
 
 from ..exceptions import EntityNotFoundError, TooManyEntitiesError
+from ..model import Entity as EntityModel
 from ..model import EntityID
 from .abstract import Entity, OptionalModelOrModels, OptionalModels, Repository
 
 log = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=128)
+def _compile_regexp(expression: str) -> Pattern[str]:
+    """Compile the regular expression of a REGEXP filter.
+
+    SQLite calls the REGEXP function once per row with the same expression, so it's
+    compiled only once.
+
+    Args:
+        expression: regular expression to compile.
+    """
+    return re.compile(expression)
+
+
 def _regexp(expression: str, item: str) -> bool:
     """Implement the REGEXP filter for SQLite.
 
@@ -28,8 +60,156 @@ def _regexp(expression: str, item: str) -> bool:
     Returns:
         if the item matches the regular expression.
     """
-    reg = re.compile(expression)
-    return reg.search(item) is not None
+    return _compile_regexp(expression).search(item) is not None
+
+
+@lru_cache(maxsize=512)
+def _upsert_statement(table_name: str, columns: Tuple[str, ...]) -> str:
+    """Build the parametrized upsert statement of a table.
+
+    Until https://github.com/kayak/pypika/issues/535 is solved we need to write the
+    upsert statement ourselves. As it only depends on the table and the columns,
+    it's built once and the values are bound on each execution.
+
+    nosec: B608:hardcoded_sql_expressions, Possible SQL injection vector through
+      string-based query construction. We're not letting the user define the
+      values of the query, the only variable inputs are the keys, that are
+      defined by the developer, so it's not probable that he chooses an
+      entity attributes that are an SQL injection. Once the #535 issue is
+      solved, we should get rid of this error too.
+
+    Args:
+        table_name: Name of the table to insert the entity into.
+        columns: Names of the columns of the table.
+    """
+    quoted_columns = ",".join([f'"{column}"' for column in columns])
+    placeholders = ",".join(["?"] * len(columns))
+    return (
+        f'INSERT INTO "{table_name}" ({quoted_columns}) '  # nosec
+        f"VALUES ({placeholders}) ON CONFLICT(id) DO UPDATE SET "
+        + ", ".join([f"{column}=excluded.{column}" for column in columns])
+    )
+
+
+@lru_cache(maxsize=256)
+def _select_statement(
+    table_name: str, conditions: Tuple[Tuple[str, bool], ...] = ()
+) -> str:
+    """Build the parametrized select statement of a table.
+
+    As it only depends on the table and the searched columns, it's built once and
+    the searched values are bound on each execution.
+
+    Args:
+        table_name: Name of the table to select the entities from.
+        conditions: Pairs of column name and whether the column is matched against
+            a regular expression instead of by equality.
+    """
+    statement = f'SELECT * FROM "{table_name}"'  # nosec
+    if len(conditions) > 0:
+        statement += " WHERE " + " AND ".join(
+            [
+                f'"{column}" REGEXP ?' if regexp else f'"{column}"=?'
+                for column, regexp in conditions
+            ]
+        )
+    return statement
+
+
+@lru_cache(maxsize=256)
+def _delete_statement(table_name: str) -> str:
+    """Build the parametrized statement that deletes an entity of a table by id.
+
+    Args:
+        table_name: Name of the table to delete the entity from.
+    """
+    return f'DELETE FROM "{table_name}" WHERE "id"=?'  # nosec
+
+
+@lru_cache(maxsize=None)
+def _table(table_name: str) -> Table:
+    """Return the pypika Table of a table name.
+
+    Args:
+        table_name: Name of the table.
+    """
+    return Table(table_name)
+
+
+# Config options that change or reject the strings when the entities are validated.
+_STRING_CONFIG_OPTIONS = {
+    "anystr_lower": False,
+    "anystr_upper": False,
+    "anystr_strip_whitespace": False,
+    "min_anystr_length": 0,
+    "max_anystr_length": None,
+}
+
+
+@lru_cache(maxsize=None)
+def _scalar_field_types(model: Type[Entity]) -> Optional[Dict[str, Tuple[type, ...]]]:
+    """Return the types that each field of a model accepts without conversion.
+
+    Only models whose fields are strings, integers or floats, and that don't have
+    validators, a custom __init__ or config options that change the strings, are
+    returned, as their entities can be built from the rows without validating them
+    when the values already have those types.
+
+    Args:
+        model: Entity class to analyze.
+
+    Returns:
+        The accepted types of each field, or None if the model needs validation.
+    """
+    if (
+        model.__validators__
+        or model.__pre_root_validators__
+        or model.__post_root_validators__
+        or model.__init__ is not EntityModel.__init__
+        or any(
+            getattr(model.__config__, option, default) != default
+            for option, default in _STRING_CONFIG_OPTIONS.items()
+        )
+    ):
+        return None
+
+    field_types: Dict[str, Tuple[type, ...]] = {}
+    for name, field in model.__fields__.items():
+        if getattr(field.outer_type_, "__origin__", None) is Union:
+            types: Tuple[type, ...] = field.outer_type_.__args__
+        else:
+            types = (field.outer_type_,)
+        if not all(type_ in (str, int, float) for type_ in types):
+            return None
+        if field.allow_none:
+            types += (type(None),)
+        field_types[name] = types
+    return field_types
+
+
+def _sql_value(value: Any) -> Any:
+    """Convert an entity attribute value into a value that sqlite can bind.
+
+    The values are stored the same way pypika writes them in the queries, so the
+    entities can be searched with them.
+
+    Args:
+        value: Value of the entity attribute.
+    """
+    if isinstance(value, Enum):
+        return _sql_value(value.value)
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        # pypika writes the decimals as numeric literals, which sqlite stores as
+        # integers if they don't have a decimal point or an exponent.
+        literal = str(value)
+        if re.fullmatch(r"-?\d+", literal):
+            return int(literal)
+        return float(literal)
+    return value
 
 
 class PypikaRepository(Repository):
@@ -54,27 +234,42 @@ class PypikaRepository(Repository):
                 raise ConnectionError(
                     f"Could not create the database file: {database_file}"
                 ) from error
-        self.connection = sqlite3.connect(database_file)
+        # The cached statements are prepared once by SQLite and reused each time
+        # they're executed with new parameters.
+        self.connection = sqlite3.connect(database_file, cached_statements=256)
+        # The writes are already grouped in the implicit transaction that is
+        # persisted on commit, use the write-ahead log so each commit doesn't need
+        # to sync the whole database file, and keep more of the database in memory.
+        self.connection.executescript(
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            "PRAGMA temp_store=MEMORY;"
+            "PRAGMA cache_size=-65536;"
+            "PRAGMA mmap_size=268435456;"
+        )
         self.connection.create_function("REGEXP", 2, _regexp)
         self.cursor = self.connection.cursor()
 
-    def _execute(self, query: Union[Query, str]) -> sqlite3.Cursor:
+    def _execute(
+        self, query: Union[Query, str], parameters: Sequence[Any] = ()
+    ) -> sqlite3.Cursor:
         """Execute an SQL statement from a Pypika query object.
 
         Args:
             query: Pypika query
+            parameters: Values to bind to the placeholders of the query.
         """
-        return self.cursor.execute(str(query))
+        return self.cursor.execute(str(query), parameters)
 
     @staticmethod
     def _table(entity: Entity) -> Table:
         """Return the table of the selected entity object."""
-        return Table(entity._model_name.lower())
+        return _table(entity._model_name_lower)
 
     @staticmethod
     def _table_model(model: Type[Entity]) -> Table:
         """Return the table of the selected entity class."""
-        return Table(model.__name__.lower())
+        return _table(model._model_name_lower)
 
     def add(self, entity: Entity) -> None:
         """Append an entity to the repository.
@@ -84,25 +279,53 @@ class PypikaRepository(Repository):
         """
         if isinstance(entity.id_, int) and entity.id_ < 0:
             entity.id_ = self._next_id(entity)
-        table = self._table(entity)
-        columns = list(entity.dict().keys())
+        self._execute(*self._upsert_row(entity))
+
+    def add_many(self, entities: Iterable[Entity]) -> None:
+        """Append several entities to the repository.
+
+        The entities of each table are upserted with a single executemany.
+
+        Args:
+            entities: Entities to add to the repository.
+        """
+        rows: Dict[str, List[List[Any]]] = {}
+        for entity in entities:
+            if isinstance(entity.id_, int) and entity.id_ < 0:
+                # The next id depends on the entities added before.
+                self._execute_many(rows)
+                rows = {}
+                self.add(entity)
+                continue
+            statement, values = self._upsert_row(entity)
+            rows.setdefault(statement, []).append(values)
+        self._execute_many(rows)
+
+    @staticmethod
+    def _upsert_row(entity: Entity) -> Tuple[str, List[Any]]:
+        """Return the upsert statement and the values to store an entity.
+
+        Args:
+            entity: Entity to store.
+        """
+        # The columns can only store scalar values, so we read the attributes
+        # directly instead of serializing the entity with dict().
+        entity_data = entity.__dict__
+        columns = list(entity_data.keys())
         columns[columns.index("id_")] = "id"
-        values = [value for key, value in entity.dict().items()]
-        insert_query = Query.into(table).columns(tuple(columns)).insert(tuple(values))
-        # Until https://github.com/kayak/pypika/issues/535 is solved we need to write
-        # The upsert statement ourselves.
-        # nosec: B608:hardcoded_sql_expressions, Possible SQL injection vector through
-        #   string-based query construction. We're not letting the user define the
-        #   values of the query, the only variable inputs are the keys, that are
-        #   defined by the developer, so it's not probable that he chooses an
-        #   entity attributes that are an SQL injection. Once the #535 issue is
-        #   solved, we should get rid of this error too.
-        upsert_query = (
-            str(insert_query)
-            + " ON CONFLICT(id) DO UPDATE SET "  # nosec
-            + ", ".join([f"{key}=excluded.{key}" for key in columns])
+        return (
+            _upsert_statement(entity._model_name_lower, tuple(columns)),
+            [_sql_value(value) for value in entity_data.values()],
         )
-        self._execute(upsert_query)
+
+    def _execute_many(self, rows: Dict[str, List[List[Any]]]) -> None:
+        """Execute each statement with all its rows of values.
+
+        Args:
+            rows: Values to bind to each statement.
+        """
+        for statement, values in rows.items():
+            self.cursor.executemany(statement, values)
 
     def delete(self, entity: Entity) -> None:
         """Delete an entity from the repository.
@@ -113,15 +336,38 @@ class PypikaRepository(Repository):
         Raises:
             EntityNotFoundError: If the entity is not found.
         """
-        table = self._table(entity)
-        try:
-            self.get(entity.id_, type(entity))
-        except EntityNotFoundError as error:
+        cursor = self._execute(
+            _delete_statement(entity._model_name_lower), [_sql_value(entity.id_)]
+        )
+        if cursor.rowcount == 0:
             raise EntityNotFoundError(
                 f"Unable to delete entity {entity} because it's not in the repository"
-            ) from error
-        query = Query.from_(table).delete().where(table.id == entity.id_)
-        self._execute(query)
+            )
+
+    def delete_many(self, entities: Iterable[Entity]) -> None:
+        """Delete several entities from the repository.
+
+        The entities of each table are deleted with a single executemany.
+
+        Args:
+            entities: Entities to remove from the repository.
+
+        Raises:
+            EntityNotFoundError: If any of the entities is not found.
+        """
+        ids: Dict[str, Set[Any]] = {}
+        for entity in entities:
+            ids.setdefault(entity._model_name_lower, set()).add(_sql_value(entity.id_))
+
+        for table_name, table_ids in ids.items():
+            cursor = self.cursor.executemany(
+                _delete_statement(table_name), [[id_] for id_ in table_ids]
+            )
+            if cursor.rowcount < len(table_ids):
+                raise EntityNotFoundError(
+                    f"Unable to delete some of the {table_name} entities because "
+                    "they're not in the repository"
+                )
 
     def get(
         self, id_: EntityID, models: OptionalModelOrModels[Entity] = None
@@ -143,9 +389,8 @@ class PypikaRepository(Repository):
         models = self._build_models(models)
 
         for model in models:
-            table = self._table_model(model)
-            query = Query.from_(table).select("*").where(table.id == id_)
-            matching_entities += self._build_entities(model, query)
+            query = _select_statement(model._model_name_lower, (("id", False),))
+            matching_entities += self._build_entities(model, query, [_sql_value(id_)])
 
         if len(matching_entities) == 1:
             return matching_entities[0]
@@ -162,38 +407,77 @@ class PypikaRepository(Repository):
         Args:
             models: Entity class or classes to obtain.
         """
-        entities = []
-        models = self._build_models(models)
+        return list(self.iter_all(models))
 
-        for model in models:
-            table = self._table_model(model)
-            query = Query.from_(table).select("*")
-            entities += self._build_entities(model, query)
+    def iter_all(
+        self, models: OptionalModelOrModels[Entity] = None
+    ) -> Iterator[Entity]:
+        """Iterate over the entities of the repository whose class is in models.
 
-        return entities
+        The rows are read from the database while the entities are requested.
+
+        Args:
+            models: Entity class or classes to obtain.
+        """
+        for model in self._build_models(models):
+            yield from self._iter_entities(
+                model, _select_statement(model._model_name_lower)
+            )
 
-    def _build_entities(self, model: Type[Entity], query: Query) -> List[Entity]:
+    def _build_entities(
+        self,
+        model: Type[Entity],
+        query: Union[Query, str],
+        parameters: Sequence[Any] = (),
+    ) -> List[Entity]:
         """Build Entity objects from the data extracted from the database.
 
         Args:
             models: The model of the entity to build
             query: pypika query of the entities you want to build
+            parameters: Values to bind to the placeholders of the query.
         """
-        cursor = self._execute(query)
+        return list(self._iter_entities(model, query, parameters))
 
-        entities_data = cursor.fetchall()
-        attributes = [description[0] for description in cursor.description]
+    def _iter_entities(
+        self,
+        model: Type[Entity],
+        query: Union[Query, str],
+        parameters: Sequence[Any] = (),
+    ) -> Iterator[Entity]:
+        """Build Entity objects one by one from the rows of a query.
 
-        entities: List[Entity] = []
-        for entity_data in entities_data:
-            entity_dict = {
-                attributes[index]: entity_data[index]
-                for index in range(0, len(entity_data))
-            }
-            entity_dict["id_"] = entity_dict.pop("id")
-
-            entities.append(model(**entity_dict))
-        return entities
+        The query is run in its own cursor so that other queries can be executed
+        while the entities are iterated.
+
+        Args:
+            models: The model of the entity to build
+            query: pypika query of the entities you want to build
+            parameters: Values to bind to the placeholders of the query.
+        """
+        cursor = self.connection.execute(str(query), parameters)
+        attributes = [description[0] for description in cursor.description]
+        attributes[attributes.index("id")] = "id_"
+        field_types = _scalar_field_types(model)
+        if field_types is not None and all(
+            attribute in field_types for attribute in attributes
+        ):
+            column_types = [field_types[attribute] for attribute in attributes]
+        else:
+            column_types = None
+
+        for entity_data in cursor:
+            entity_attributes = dict(zip(attributes, entity_data))
+            if column_types is not None and all(
+                type(value) in types for value, types in zip(entity_data, column_types)
+            ):
+                # The row values already have the types of the fields, so we skip
+                # the validation.
+                entity = model.construct(**entity_attributes)
+                entity._model_name = model.__name__
+                yield entity
+            else:
+                yield model(**entity_attributes)
 
     def commit(self) -> None:
         """Persist the changes into the repository."""
@@ -218,21 +502,16 @@ class PypikaRepository(Repository):
         """
         entities: List[Entity] = []
         models = self._build_models(models)
+        conditions = tuple(
+            ("id" if key == "id_" else key, isinstance(value, str))
+            for key, value in fields.items()
+        )
+        values = [_sql_value(value) for value in fields.values()]
 
         for model in models:
-            table = self._table_model(model)
-            query = Query.from_(table).select("*")
-
-            for key, value in fields.items():
-                if key == "id_":
-                    key = "id"
-                if isinstance(value, str):
-                    query = query.where(getattr(table, key).regexp(value))
-                else:
-                    query = query.where(getattr(table, key) == value)
-
+            query = _select_statement(model._model_name_lower, conditions)
             with suppress(OperationalError):
-                entities += self._build_entities(model, query)
+                entities += self._build_entities(model, query, values)
 
         if len(entities) == 0:
             raise self._model_not_found(
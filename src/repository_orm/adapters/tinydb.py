@@ -1,13 +1,20 @@
 """Define the TinyDB Repository."""
 
+import json
 import os
 import re
 from contextlib import suppress
-from typing import Any, Dict, Iterable, List
-
-from tinydb import Query, TinyDB
-from tinydb.queries import QueryInstance
-from tinydb.storages import JSONStorage
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, Union
+
+import orjson
+from pydantic import BaseModel
+from pydantic.fields import ModelField
+from tinydb import TinyDB
+from tinydb.middlewares import CachingMiddleware, Middleware
+from tinydb.storages import JSONStorage, Storage
+from tinydb.table import Document, Table
 from tinydb_serialization import SerializationMiddleware
 from tinydb_serialization.serializers import DateTimeSerializer
 
@@ -15,7 +22,100 @@ from repository_orm.exceptions import TooManyEntitiesError
 
 from ..exceptions import EntityNotFoundError
 from ..model import EntityID
-from .abstract import Entity, Models, OptionalModelOrModels, OptionalModels, Repository
+from .abstract import (
+    _ID,
+    _MISSING,
+    Entity,
+    OptionalModelOrModels,
+    OptionalModels,
+    Repository,
+)
+
+
+@lru_cache(maxsize=None)
+def _may_store_datetimes(model: Type[BaseModel]) -> bool:
+    """Check if the exported data of a model may contain datetime values."""
+    return any(_field_may_store_datetimes(field) for field in model.__fields__.values())
+
+
+def _field_may_store_datetimes(field: ModelField) -> bool:
+    """Check if the exported data of a model field may contain datetime values.
+
+    Fields that can hold arbitrary values are considered to contain datetimes.
+    """
+    if field.sub_fields:
+        return any(
+            _field_may_store_datetimes(sub_field) for sub_field in field.sub_fields
+        )
+    if field.type_ in (Any, object):
+        return True
+    if not isinstance(field.type_, type):
+        return False
+    if issubclass(field.type_, BaseModel):
+        return _may_store_datetimes(field.type_)
+    return issubclass(field.type_, (datetime, dict, list, set, tuple))
+
+
+# Table where older versions of the repository stored all the entities.
+LEGACY_TABLE = "_default"
+
+# orjson only supports 64-bit integers, bigger numbers are loaded as floats.
+_LONG_NUMBER = re.compile(rb"\d{19,}")
+
+
+class OrjsonStorage(JSONStorage):
+    """Store the TinyDB data in a json file using orjson to (de)serialize it.
+
+    TinyDB reads or writes the whole database each time it's accessed, so the speed
+    of the json library sets the speed of the repository.
+
+    orjson doesn't support integers bigger than 64 bits, databases that may contain
+    them are (de)serialized with the json library instead.
+    """
+
+    def __init__(self, path: str, create_dirs: bool = False) -> None:
+        """Open the database file in binary mode, as orjson works with bytes.
+
+        Args:
+            path: Path to the database file.
+            create_dirs: Whether to create the parent directories of the file.
+        """
+        super().__init__(path, create_dirs=create_dirs, access_mode="rb+")
+
+    def read(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Read the content of the database file.
+
+        Returns:
+            The database data or None if the file is empty.
+        """
+        self._handle.seek(0)
+        content = self._handle.read()
+        if len(content) == 0:
+            return None
+        if _LONG_NUMBER.search(content):
+            return json.loads(content)
+        return orjson.loads(content)
+
+    def write(self, data: Dict[str, Dict[str, Any]]) -> None:
+        """Replace the content of the database file with the data.
+
+        Args:
+            data: Database data to store.
+        """
+        try:
+            content = orjson.dumps(
+                data,
+                option=orjson.OPT_INDENT_2
+                | orjson.OPT_NON_STR_KEYS
+                | orjson.OPT_SORT_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            content = json.dumps(data, indent=2, sort_keys=True).encode()
+        self._handle.seek(0)
+        self._handle.write(content)
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._handle.truncate()
 
 
 class TinyDBRepository(Repository):
@@ -41,13 +141,41 @@ class TinyDBRepository(Repository):
                     f"Could not create the database file: {self.database_file}"
                 ) from error
 
-        serialization = SerializationMiddleware(JSONStorage)
-        serialization.register_serializer(DateTimeSerializer(), "TinyDate")
-
-        self.db_ = TinyDB(
-            self.database_file, storage=serialization, sort_keys=True, indent=4
+        # The serialization middleware walks every value on each read and write, so
+        # we only use it if any of the models may store datetimes or the database
+        # already contains them.
+        self._open_database(
+            len(self.models) == 0
+            or any(_may_store_datetimes(model) for model in self.models)
+            or self._stores_datetimes()
         )
         self.staged: Dict[str, List[Any]] = {"add": [], "remove": []}
+        self._index: Dict[str, Dict[EntityID, int]] = {}
+        self._index_signature: Optional[Tuple[int, int]] = None
+
+    def _open_database(self, serialize_datetimes: bool) -> None:
+        """Create the TinyDB object used to access the database file.
+
+        Args:
+            serialize_datetimes: Whether to use the serialization middleware to store
+                the datetimes.
+        """
+        storage: Union[Type[Storage], Middleware] = OrjsonStorage
+        if serialize_datetimes:
+            serialization = SerializationMiddleware(OrjsonStorage)
+            serialization.register_serializer(DateTimeSerializer(), "TinyDate")
+            storage = serialization
+
+        # Keep the database in memory between operations, the cache is dropped when
+        # the file is changed outside the repository and flushed on each commit.
+        self._cache = CachingMiddleware(storage)  # type: ignore
+        self.db_ = TinyDB(self.database_file, storage=self._cache)
+        self._serialize_datetimes = serialize_datetimes
+
+    def _stores_datetimes(self) -> bool:
+        """Check if the database file contains serialized datetimes."""
+        with open(self.database_file, "rb") as file_cursor:
+            return b"{TinyDate}:" in file_cursor.read()
 
     def add(self, entity: Entity) -> None:
         """Append an entity to the repository.
@@ -89,13 +217,20 @@ class TinyDBRepository(Repository):
             EntityNotFoundError: If the entity is not found.
             TooManyEntitiesError: If more than one entity was found.
         """
+        matching_entities_data: List[Tuple[Type[Entity], Document]] = []
         models = self._build_models(models)
-        model_query = self._build_model_query(models)
+        index = self._load_index()
 
-        matching_entities_data = self.db_.search((Query().id_ == id_) & (model_query))
+        for model in models:
+            with suppress(KeyError):
+                document = self._table(model).get(
+                    doc_id=index[model._model_name_lower][id_]
+                )
+                if document is not None:
+                    matching_entities_data.append((model, document))
 
         if len(matching_entities_data) == 1:
-            return self._build_entity(matching_entities_data[0], models)
+            return self._build_entity(*matching_entities_data[0])
         elif len(matching_entities_data) == 0:
             raise self._model_not_found(models, f" with id {id_}")
         else:
@@ -103,82 +238,160 @@ class TinyDBRepository(Repository):
                 f"More than one entity was found with the id {id_}"
             )
 
-    def _build_entity(
-        self,
-        entity_data: Dict[Any, Any],
-        models: OptionalModelOrModels[Entity] = None,
-    ) -> Entity:
+    @staticmethod
+    def _build_entity(model: Type[Entity], entity_data: Dict[Any, Any]) -> Entity:
         """Create an entity from the data stored in a row of the database.
 
         Args:
+            model: Type of entity object to obtain.
             entity_data: Dictionary with the attributes of the entity.
-            models: Type of entity object to obtain.
 
         Returns:
             entity: Built Entity.
         """
-        # If we don't copy the data, the all method stops being idempotent.
-        entity_data = entity_data.copy()
-        model_name = entity_data.pop("model_type_")
-        models = self._build_models(models)
-
-        for model in models:
-            if model.schema()["title"].lower() == model_name:
-                model = model
-                break
         return model.parse_obj(entity_data)
 
+    def _table(self, model: Type[Entity]) -> Table:
+        """Return the TinyDB table where the entities of a model are stored.
+
+        Args:
+            model: Entity class whose table we want to get.
+        """
+        return self.db_.table(model._model_name_lower)
+
     def all(self, models: OptionalModelOrModels[Entity] = None) -> List[Entity]:
         """Get all the entities from the repository whose class is included in models.
 
         Args:
             models: Entity class or classes to obtain.
         """
-        entities: List[Entity] = []
-        models = self._build_models(models)
-
-        if models == self.models:
-            entities_data = self.db_.all()
-        else:
-            query = self._build_model_query(models)
-            entities_data = self.db_.search(query)
+        return list(self.iter_all(models))
 
-        for entity_data in entities_data:
-            entities.append(self._build_entity(entity_data, models))
+    def iter_all(
+        self, models: OptionalModelOrModels[Entity] = None
+    ) -> Iterator[Entity]:
+        """Iterate over the entities of the repository whose class is in models.
 
-        return entities
-
-    @staticmethod
-    def _export_entity(entity: Entity) -> Dict[Any, Any]:
-        """Export the attributes of the entity appending the required by TinyDB.
+        The entities are built when they're requested.
 
         Args:
-            entity: Entity to export.
-
-        Returns:
-            entity_data: Dictionary with the attributes of the entity.
+            models: Entity class or classes to obtain.
         """
-        entity_data = entity.dict()
-        entity_data["model_type_"] = entity._model_name.lower()
+        models = self._build_models(models)
+        index = self._load_index()
 
-        return entity_data
+        for model in models:
+            documents = {document.doc_id: document for document in self._table(model)}
+            # Copy the document ids, as a commit may change the index while iterating.
+            for doc_id in list(index.get(model._model_name_lower, {}).values()):
+                yield self._build_entity(model, documents[doc_id])
 
     def commit(self) -> None:
         """Persist the changes into the repository."""
+        if not self._serialize_datetimes and any(
+            _may_store_datetimes(entity.__class__) for entity in self.staged["add"]
+        ):
+            self._open_database(serialize_datetimes=True)
+        index = self._load_index()
+        updated_entities: Dict[str, Dict[EntityID, Dict[Any, Any]]] = {}
+        new_entities: Dict[str, Dict[EntityID, Dict[Any, Any]]] = {}
+        removed_doc_ids: Dict[str, List[int]] = {}
+
         for entity in self.staged["add"]:
-            self.db_.upsert(
-                self._export_entity(entity),
-                (Query().model_type_ == entity._model_name.lower())
-                & (Query().id_ == entity.id_),
-            )
+            table_name = entity._model_name_lower
+            if entity.id_ in index.get(table_name, {}):
+                changes = updated_entities
+            else:
+                changes = new_entities
+            changes.setdefault(table_name, {})[entity.id_] = entity.dict()
+
+        # The write operations change the cached database, which is dumped to the
+        # file once all the changes are applied. If anything fails, the cached
+        # database and the index are dropped so they're loaded again from the file,
+        # and the changes are kept staged.
+        try:
+            for table_name, entities_data in updated_entities.items():
+                self.db_.table(table_name).update(
+                    lambda document: document.update(entities_data[document["id_"]]),
+                    doc_ids=[index[table_name][id_] for id_ in entities_data],
+                )
+
+            for table_name, entities_data in new_entities.items():
+                doc_ids = self.db_.table(table_name).insert_multiple(
+                    entities_data.values()
+                )
+                index.setdefault(table_name, {}).update(zip(entities_data, doc_ids))
+
+            for entity in self.staged["remove"]:
+                table_name = entity._model_name_lower
+                doc_id = index.get(table_name, {}).pop(entity.id_, None)
+                if doc_id is not None:
+                    removed_doc_ids.setdefault(table_name, []).append(doc_id)
+
+            for table_name, doc_ids in removed_doc_ids.items():
+                self.db_.table(table_name).remove(doc_ids=doc_ids)
+            self._cache.flush()  # type: ignore
+        except Exception:
+            self._cache.cache = None
+            self._index_signature = None
+            raise
         self.staged["add"].clear()
+        self.staged["remove"].clear()
+
+        # Our own writes don't invalidate the index.
+        self._index_signature = self._storage_signature()
+
+    def _storage_signature(self) -> Tuple[int, int]:
+        """Return the modification time and size of the database file."""
+        stat = os.stat(self.database_file)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load_index(self) -> Dict[str, Dict[EntityID, int]]:
+        """Return the index that maps each table and id_ to the document id.
 
-        for entity in self.staged["remove"]:
-            self.db_.remove(
-                (Query().model_type_ == entity._model_name.lower())
-                & (Query().id_ == entity.id_)
+        The index is rebuilt whenever the database file was changed outside the
+        repository, so `get`, `all`, `last` and `commit` don't need to scan all the
+        documents.
+        """
+        signature = self._storage_signature()
+        if signature != self._index_signature:
+            if not self._serialize_datetimes and self._stores_datetimes():
+                self._open_database(serialize_datetimes=True)
+            self._cache.cache = None
+            # The tables remember the next document id, which may already be taken
+            # by the documents added by someone else.
+            self.db_._tables.clear()
+            if len(self.db_.table(LEGACY_TABLE)) > 0:
+                self._migrate_legacy_table()
+                signature = self._storage_signature()
+            self._index = {}
+            for table_name in self.db_.tables():
+                self._index[table_name] = {
+                    document["id_"]: document.doc_id
+                    for document in self.db_.table(table_name).all()
+                }
+            self._index_signature = signature
+        return self._index
+
+    def _migrate_legacy_table(self) -> None:
+        """Move the entities stored in the legacy table to the tables of their models.
+
+        Older versions of the repository stored all the entities in the default
+        table, with the name of their model in the model_type_ attribute.
+        """
+        legacy_entities: Dict[str, List[Dict[str, Any]]] = {}
+        for document in self.db_.table(LEGACY_TABLE).all():
+            entity_data = dict(document)
+            legacy_entities.setdefault(entity_data.pop("model_type_"), []).append(
+                entity_data
             )
-        self.staged["remove"].clear()
+
+        try:
+            for table_name, entities_data in legacy_entities.items():
+                self.db_.table(table_name).insert_multiple(entities_data)
+            self.db_.drop_table(LEGACY_TABLE)
+        finally:
+            self._cache.flush()  # type: ignore
 
     def search(
         self,
@@ -197,112 +410,47 @@ class TinyDBRepository(Repository):
         Raises:
             EntityNotFoundError: If the entities are not found.
         """
-        entities: List[Entity] = []
-        models = self._build_models(models)
-        query = self._build_search_query(fields, models)
-
-        # Build entities
-        entities_data = self.db_.search(query)
+        return list(self.iter_search(fields, models))
 
-        for entity_data in entities_data:
-            entities.append(self._build_entity(entity_data, models))
-
-        if len(entities) == 0:
-            raise self._model_not_found(
-                models, f" that match the search filter {fields}"
-            )
-
-        return entities
-
-    def _build_search_query(
+    def iter_search(
         self,
         fields: Dict[str, EntityID],
-        models: Models[Entity],
-    ) -> QueryInstance:
-        """Build the Query parts for a repository search.
+        models: OptionalModelOrModels[Entity] = None,
+    ) -> Iterator[Entity]:
+        """Iterate over the entities whose attributes match one or several conditions.
 
-        Select only the models that contain the fields. If the field type is a list,
-        change the query accordingly.
+        The entities are built when they're requested.
 
         Args:
-            models: Type of entity object to obtain.
+            models: Entity class or classes to obtain.
             fields: Dictionary with the {key}:{value} to search.
 
-        Returns:
-            Query based on the type of models and fields.
+        Raises:
+            EntityNotFoundError: When requesting the first entity if no entity
+                matches the conditions.
         """
-        query_parts = []
+        models = self._build_models(models)
+        conditions = self._build_search_conditions(fields)
+        index = self._load_index()
+        found = False
 
         for model in models:
-            schema = model.schema()["properties"]
-            for field, value in fields.items():
-                if field not in schema.keys():
-                    continue
-
-                with suppress(KeyError):
-                    if schema[field]["type"] == "array":
-                        query_parts.append(
-                            (Query().model_type_ == model.__name__.lower())
-                            & (Query()[field].test(_regexp_in_list, value))
-                        )
-                        continue
-
-                if isinstance(value, str):
-                    query_parts.append(
-                        (Query().model_type_ == model.__name__.lower())
-                        & (Query()[field].search(value))
-                    )
-                else:
-                    query_parts.append(Query()[field] == value)
-        if len(query_parts) == 0:
+            documents = {document.doc_id: document for document in self._table(model)}
+            # Copy the document ids, as a commit may change the index while iterating.
+            for doc_id in list(index.get(model._model_name_lower, {}).values()):
+                document = documents[doc_id]
+                if all(
+                    condition(document.get(key, _MISSING))
+                    for key, condition in conditions
+                ):
+                    found = True
+                    yield self._build_entity(model, document)
+
+        if not found:
             raise self._model_not_found(
                 models, f" that match the search filter {fields}"
             )
 
-        return self._merge_query(query_parts, mode="or")
-
-    def _build_model_query(
-        self,
-        models: Models[Entity],
-    ) -> QueryInstance:
-        """Build the Query parts from the models.
-
-        Args:
-            models: Type of entity object to obtain.
-
-        Returns:
-            List of query parts based on the type of models
-        """
-        query_parts = []
-
-        for model in models:
-            query_parts.append(Query().model_type_ == model.__name__.lower())
-
-        return self._merge_query(query_parts, mode="or")
-
-    @staticmethod
-    def _merge_query(
-        query_parts: List[QueryInstance], mode: str = "and"
-    ) -> QueryInstance:
-        """Join all the query parts into a query.
-
-        Args:
-            query_parts: List of queries to concatenate.
-            mode: "and" or "or" for the join method.
-
-        Returns:
-            A query object that joins all parts.
-        """
-        query = query_parts[0]
-
-        for query_part in query_parts[1:]:
-            if mode == "and":
-                query = query & query_part
-            else:
-                query = query | query_part
-
-        return query
-
     def apply_migrations(self, migrations_directory: str) -> None:
         """Run the migrations of the repository schema.
 
@@ -325,30 +473,44 @@ class TinyDBRepository(Repository):
             EntityNotFoundError: If there are no entities.
         """
         try:
-            last_index_entity: Entity = super().last(models)
+            last_index_entity: Entity = self._last_stored(models)
         except EntityNotFoundError as empty_repo:
             try:
                 # Empty repo but entities staged to be commited.
-                return max(self.staged["add"])
+                return max(self.staged["add"], key=_ID)
             except ValueError as no_staged_entities:
                 # Empty repo and no entities staged.
                 raise empty_repo from no_staged_entities
 
         try:
-            last_staged_entity = max(self.staged["add"])
+            last_staged_entity = max(self.staged["add"], key=_ID)
         except ValueError:
             # Full repo and no staged entities.
             return last_index_entity
 
         # Full repo and staged entities.
-        return max([last_index_entity, last_staged_entity])
+        return max([last_index_entity, last_staged_entity], key=_ID)
 
+    def _last_stored(self, models: OptionalModelOrModels[Entity] = None) -> Entity:
+        """Get the biggest entity stored in the database.
 
-def _regexp_in_list(list_: Iterable[Any], regular_expression: str) -> bool:
-    """Test if regexp matches any element of the list."""
-    regexp = re.compile(regular_expression)
+        Only the entity with the biggest id_ of each model is built, the rest are
+        discarded by comparing the ids stored in the index.
 
-    try:
-        return any(regexp.search(element) for element in list_)
-    except TypeError:
-        return False
+        Args:
+            models: Entity class or classes to obtain.
+
+        Raises:
+            EntityNotFoundError: If there are no entities.
+        """
+        models = self._build_models(models)
+        index = self._load_index()
+        last_entities = [
+            self.get(max(index[model._model_name_lower]), model)
+            for model in models
+            if index.get(model._model_name_lower)
+        ]
+
+        if len(last_entities) == 0:
+            raise self._model_not_found(models)
+        return max(last_entities, key=_ID)
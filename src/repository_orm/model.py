@@ -1,6 +1,6 @@
 """Module to store the common business model of all entities."""
 
-from typing import Any, Union
+from typing import Any, ClassVar, Union
 
 from pydantic import BaseModel, PrivateAttr
 
@@ -18,6 +18,12 @@ class Entity(BaseModel):
 
     id_: EntityID = -1
     _model_name: str = PrivateAttr()
+    _model_name_lower: ClassVar[str] = "entity"
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Set the _model_name_lower class attribute."""
+        super().__init_subclass__(**kwargs)
+        cls._model_name_lower = cls.__name__.lower()
 
     def __init__(self, **data: Any) -> None:
         """Set the _model_name attribute."""
@@ -5,7 +5,8 @@ import datetime
 import json
 import logging
 import sqlite3
-from typing import Any, Dict, Generator, Generic, List, Type, TypeVar
+from contextlib import contextmanager
+from typing import Any, Dict, Generator, Generic, List, Sequence, Type, TypeVar
 
 from _pytest.logging import LogCaptureFixture
 from pypika import Query, Table
@@ -50,6 +51,11 @@ class RepositoryTester(abc.ABC, Generic[Repository]):
         """Insert the data of an entity into the repository."""
         raise NotImplementedError
 
+    def insert_entities(self, database: Any, entities: Sequence[Entity]) -> None:
+        """Insert the data of several entities into the repository."""
+        for entity in entities:
+            self.insert_entity(database, entity)
+
 
 # R0201: We can't define the method as a class function to maintain the parent interface
 # W0613: We require these arguments to maintain the parent interface.
@@ -72,10 +78,10 @@ class FakeRepositoryTester(RepositoryTester[FakeRepository]):
         self, database: FakeRepositoryDB[Entity], entity: Entity
     ) -> Entity:
         """Get the entity object from the data stored in the repository by it's id."""
-        try:
-            return database[type(entity)][entity.id_]
-        except (TypeError, KeyError) as error:
-            raise EntityNotFoundError() from error
+        stored_entity = database.get(type(entity), {}).get(entity.id_)
+        if stored_entity is None:
+            raise EntityNotFoundError()
+        return stored_entity
 
     def get_all(  # noqa: R0201
         self, database: FakeRepositoryDB[Entity], entity_model: Type[Entity]
@@ -90,12 +96,7 @@ class FakeRepositoryTester(RepositoryTester[FakeRepository]):
         self, database: FakeRepositoryDB[Entity], entity: Entity
     ) -> None:
         """Insert the data of an entity into the repository."""
-        try:
-            database[type(entity)]
-        except KeyError:
-            database[type(entity)] = {}
-
-        database[type(entity)][entity.id_] = entity
+        database.setdefault(type(entity), {})[entity.id_] = entity
 
 
 class TinyDBRepositoryTester(RepositoryTester[TinyDBRepository]):
@@ -119,17 +120,15 @@ class TinyDBRepositoryTester(RepositoryTester[TinyDBRepository]):
         with open(database_file, "r") as file_cursor:
             content = file_cursor.read()
             if content == "":
-                content = '{"_default": {}}'
+                content = "{}"
             return json.loads(content)
 
     def get_entity(self, database: str, entity: Entity) -> Entity:
         """Get the entity object from the data stored in the repository by it's id."""
         cursor = self._build_cursor(database)
-        for _document_id, entry in cursor["_default"].items():
-            if (
-                entry["id_"] == entity.id_
-                and entry["model_type_"] == entity._model_name.lower()
-            ):
+        table = cursor.get(entity._model_name.lower(), {})
+        for _document_id, entry in table.items():
+            if entry["id_"] == entity.id_:
                 return self._build_entity(entry, entity.__class__)
         raise EntityNotFoundError()
 
@@ -146,7 +145,6 @@ class TinyDBRepositoryTester(RepositoryTester[TinyDBRepository]):
         Returns:
             entity: Entity object built from the data.
         """
-        entity_data.pop("model_type_")
         for key, value in entity_data.items():
             if isinstance(value, str) and "TinyDate" in value:
                 value = value.replace("{TinyDate}:", "")
@@ -157,28 +155,34 @@ class TinyDBRepositoryTester(RepositoryTester[TinyDBRepository]):
     def get_all(self, database: str, entity_model: Type[Entity]) -> List[Entity]:
         """Get all the entities of type entity_model from the database."""
         cursor = self._build_cursor(database)
-        entities = []
-        for _document_id, entry in cursor["_default"].items():
-            if entry["model_type_"] == entity_model.__name__.lower():
-                entities.append(self._build_entity(entry, entity_model))
-        return entities
+        table = cursor.get(entity_model.__name__.lower(), {})
+        return [self._build_entity(entry, entity_model) for entry in table.values()]
 
     def insert_entity(self, database: str, entity: Entity) -> None:
         """Insert the data of an entity into the repository."""
+        self.insert_entities(database, [entity])
+
+    def insert_entities(self, database: str, entities: Sequence[Entity]) -> None:
+        """Insert the data of several entities into the repository.
+
+        The database file is read and written once for all the entities.
+        """
         cursor = self._build_cursor(database)
 
-        database_entry = entity.dict()
-        database_entry["model_type_"] = entity._model_name.lower()
-        for key, value in database_entry.items():
-            if isinstance(value, datetime.datetime):
-                database_entry[key] = "{TinyDate}:" + value.isoformat()
+        for entity in entities:
+            table = cursor.setdefault(entity._model_name.lower(), {})
 
-        try:
-            max_document = int(max(key for key in cursor["_default"]))
-        except ValueError:
-            max_document = -1
+            database_entry = entity.dict()
+            for key, value in database_entry.items():
+                if isinstance(value, datetime.datetime):
+                    database_entry[key] = "{TinyDate}:" + value.isoformat()
+
+            try:
+                max_document = max(int(key) for key in table)
+            except ValueError:
+                max_document = 0
 
-        cursor["_default"][max_document + 1] = database_entry
+            table[str(max_document + 1)] = database_entry
 
         database_file = database.replace("tinydb:///", "")
         with open(database_file, "w+") as file_cursor:
@@ -189,13 +193,17 @@ class PypikaRepositoryTester(RepositoryTester[PypikaRepository]):
     """Gathers methods needed to test the implementation of the PypikaRepository."""
 
     @staticmethod
+    @contextmanager
     def _build_cursor(database_url: str) -> Generator[sqlite3.Cursor, None, None]:
-        """Create a cursor to connect to the database."""
-        connection = sqlite3.connect(database_url.replace("sqlite:///", ""))
-
-        yield connection.cursor()
+        """Create a cursor to connect to the database.
 
-        connection.close()
+        The connection is closed when the context manager exits.
+        """
+        connection = sqlite3.connect(database_url.replace("sqlite:///", ""))
+        try:
+            yield connection.cursor()
+        finally:
+            connection.close()
 
     @staticmethod
     def apply_migrations(repo: PypikaRepository) -> None:
@@ -208,8 +216,8 @@ class PypikaRepositoryTester(RepositoryTester[PypikaRepository]):
         caplog: LogCaptureFixture,
     ) -> None:
         """Make sure that the repository has a valid schema."""
-        cursor = next(self._build_cursor(database))
-        assert len(cursor.execute("SELECT * from _yoyo_log").fetchall()) > 0
+        with self._build_cursor(database) as cursor:
+            assert len(cursor.execute("SELECT * from _yoyo_log").fetchall()) > 0
         assert (
             "repository_orm.adapters.pypika",
             logging.DEBUG,
@@ -225,11 +233,10 @@ class PypikaRepositoryTester(RepositoryTester[PypikaRepository]):
             entity_model: The model of the entity to build
             query: pypika query of the entities you want to build
         """
-        cursor = next(self._build_cursor(database))
-        cursor = cursor.execute(str(query))
-
-        entities_data = cursor.fetchall()
-        attributes = [description[0] for description in cursor.description]
+        with self._build_cursor(database) as cursor:
+            cursor = cursor.execute(str(query))
+            entities_data = cursor.fetchall()
+            attributes = [description[0] for description in cursor.description]
 
         entities: List[Entity] = []
         for entity_data in entities_data:
@@ -268,10 +275,11 @@ class PypikaRepositoryTester(RepositoryTester[PypikaRepository]):
     def insert_entity(self, database: str, entity: Entity) -> None:
         """Insert the data of an entity into the repository."""
         table = Table(entity._model_name.lower())
-        cursor = next(self._build_cursor(database))
-        columns = list(entity.dict().keys())
+        entity_data = entity.dict()
+        columns = list(entity_data.keys())
         columns[columns.index("id_")] = "id"
-        values = [value for key, value in entity.dict().items()]
+        values = list(entity_data.values())
         query = Query.into(table).columns(tuple(columns)).insert(tuple(values))
-        cursor.execute(str(query))
-        cursor.connection.commit()
+        with self._build_cursor(database) as cursor:
+            cursor.execute(str(query))
+            cursor.connection.commit()
@@ -170,21 +170,27 @@ def int_entity(entity_factory: factory.Factory) -> Entity:
 @parametrize_with_cases("entity_factory", cases=EntityCases)
 def entities(entity_factory: factory.Factory) -> List[Entity]:
     """Return three entities for each entity type defined in the EntityCases."""
-    return sorted(entity_factory.create_batch(3))
+    created_entities = entity_factory.create_batch(3)
+    created_entities.sort()
+    return created_entities
 
 
 @fixture
 @parametrize_with_cases("entity_factory", cases=StrEntityCases)
 def str_entities(entity_factory: factory.Factory) -> List[Entity]:
     """Return three entities for each entity type defined in the StrEntityCases."""
-    return sorted(entity_factory.create_batch(3))
+    created_entities = entity_factory.create_batch(3)
+    created_entities.sort()
+    return created_entities
 
 
 @fixture
 @parametrize_with_cases("entity_factory", cases=IntEntityCases)
 def int_entities(entity_factory: factory.Factory) -> List[Entity]:
     """Return three entities for each entity type defined in the IntEntityCases."""
-    return sorted(entity_factory.create_batch(3))
+    created_entities = entity_factory.create_batch(3)
+    created_entities.sort()
+    return created_entities
 
 
 @fixture
@@ -243,6 +249,5 @@ def inserted_entities(
 
     For each entity type defined in the EntityCases.
     """
-    for entity_to_insert in entities:
-        repo_tester.insert_entity(database, entity_to_insert)
+    repo_tester.insert_entities(database, entities)
     return entities
@@ -0,0 +1,107 @@
+"""Tests the behaviour specific to the FakeRepository."""
+
+from typing import List
+
+import pytest
+
+from repository_orm import (
+    Entity,
+    EntityNotFoundError,
+    FakeRepository,
+    FakeRepositoryDB,
+)
+
+from ..cases.model import Author, ListEntity
+from ..cases.testers import FakeRepositoryTester
+
+
+def test_repo_all_is_sorted_after_commits_change_the_entities(
+    repo_fake: FakeRepository,
+) -> None:
+    """
+    Given: A repository that has already used the all method
+    When: Entities are added and deleted, and all is called again
+    Then: The entities with the changes are returned sorted by id_
+    """
+    authors = [Author(id_=id_, name=f"Author {id_}") for id_ in ("a", "b", "c", "d")]
+    for author in authors[:3]:
+        repo_fake.add(author)
+    repo_fake.commit()
+    repo_fake.all()
+    repo_fake.delete(authors[1])
+    repo_fake.add(authors[3])
+    repo_fake.commit()
+    repo_fake.add(authors[1])
+    repo_fake.delete(authors[2])
+    repo_fake.commit()
+
+    result: List[Entity] = repo_fake.all()
+
+    assert result == [authors[0], authors[1], authors[3]]
+
+
+def test_repo_is_not_changed_by_editing_the_returned_entities(
+    repo_fake: FakeRepository,
+) -> None:
+    """
+    Given: A repository with an entity that has already been searched by a field
+    When: The entity returned by get is changed but not added again
+    Then: The equality and regex searches return the stored entity
+    """
+    author = Author(id_="a", name="Author", rating=1)
+    repo_fake.add(author)
+    repo_fake.commit()
+    repo_fake.search({"rating": 1}, Author)
+    changed_author = repo_fake.get("a", Author)
+    changed_author.name = "Changed"
+    changed_author.rating = 2
+
+    result = [
+        repo_fake.search({"rating": 1}, Author),
+        repo_fake.search({"name": "Author"}, Author),
+    ]
+
+    assert result == [[author], [author]]
+    with pytest.raises(EntityNotFoundError):
+        repo_fake.search({"rating": 2}, Author)
+
+
+def test_repo_is_not_changed_by_editing_the_lists_of_the_entities(
+    repo_fake: FakeRepository,
+) -> None:
+    """
+    Given: A repository with an entity with a list attribute
+    When: The list of the added entity and of the entity returned by get are changed
+    Then: The stored entity is not changed
+    """
+    entity = ListEntity(id_=1, name="Entity", elements=["a"])
+    repo_fake.add(entity)
+    repo_fake.commit()
+    entity.elements.append("b")
+
+    repo_fake.get(1, ListEntity).elements.append("c")  # act
+
+    assert repo_fake.get(1, ListEntity).elements == ["a"]
+
+
+def test_repo_uses_the_entities_inserted_directly_in_the_database(
+    repo_fake: FakeRepository,
+) -> None:
+    """
+    Given: A repository that has already used all and search
+    When: An entity is inserted directly in the entities attribute
+    Then: all and search return the new entity
+    """
+    authors = [Author(id_=id_, name="Author", rating=1) for id_ in ("a", "b")]
+    repo_fake.add(authors[1])
+    repo_fake.commit()
+    repo_fake.all()
+    repo_fake.search({"rating": 1}, Author)
+
+    # ignore: the entities attribute is typed with the repository type variable.
+    database: FakeRepositoryDB[Entity] = repo_fake.entities  # type: ignore
+
+    FakeRepositoryTester().insert_entity(database, authors[0])  # act
+
+    assert repo_fake.all(Author) == authors
+    assert repo_fake.search({"rating": 1}, Author) == authors
@@ -0,0 +1,153 @@
+"""Tests the behaviour specific to the PypikaRepository."""
+
+import uuid
+from datetime import date
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+from pydantic import BaseConfig
+from pypika import Query, Table
+
+from repository_orm import Entity, PypikaRepository
+from repository_orm.adapters.pypika import _scalar_field_types
+
+from ..cases.model import Author
+
+
+class Tag(Entity):
+    """Entity to model an entity whose config changes the strings."""
+
+    name: str
+
+    class Config(BaseConfig):
+        """Store the names in lowercase."""
+
+        anystr_lower = True
+
+
+class Person(Entity):
+    """Entity to model an entity that changes the strings in its __init__."""
+
+    name: str
+
+    def __init__(self, **data: Any) -> None:
+        """Capitalize the name of the person."""
+        super().__init__(**data)
+        self.name = self.name.title()
+
+
+def test_repo_builds_the_entities_of_scalar_models(
+    repo_pypika: PypikaRepository,
+) -> None:
+    """
+    Given: A stored entity of a model whose fields are strings or integers
+    When: The entity is read
+    Then: The entity is built from the row without validating it, and without
+        losing any attribute
+    """
+    author = Author(id_="author", name="Author name", rating=3)
+    repo_pypika.add(author)
+    repo_pypika.commit()
+
+    result = repo_pypika.get("author", Author)
+
+    assert _scalar_field_types(Author) is not None
+    assert result == author
+    assert result._model_name == "Author"
+
+
+def test_repo_validates_the_entities_whose_config_changes_the_strings(
+    repo_pypika: PypikaRepository,
+) -> None:
+    """
+    Given: A row stored outside the repository for a model that stores its strings
+        in lowercase
+    When: The entity is read
+    Then: The entity is validated, so the string is lowercase
+    """
+    repo_pypika.connection.execute(
+        "CREATE TABLE tag (id INTEGER PRIMARY KEY, name VARCHAR(20))"
+    )
+    repo_pypika.connection.execute("INSERT INTO tag (id, name) VALUES (1, 'MiXeD')")
+
+    result = repo_pypika.get(1, Tag)
+
+    assert result.name == "mixed"
+
+
+def test_repo_validates_the_entities_with_custom_init(
+    repo_pypika: PypikaRepository,
+) -> None:
+    """
+    Given: A row stored outside the repository for a model that changes the
+        strings in its __init__
+    When: The entity is read
+    Then: The __init__ of the model is used to build the entity
+    """
+    repo_pypika.connection.execute(
+        "CREATE TABLE person (id INTEGER PRIMARY KEY, name VARCHAR(20))"
+    )
+    repo_pypika.connection.execute(
+        "INSERT INTO person (id, name) VALUES (1, 'john doe')"
+    )
+
+    result = repo_pypika.all(Person)
+
+    assert result == [Person(id_=1, name="John Doe")]
+
+
+class Color(str, Enum):
+    """Define the possible colors of an entity."""
+
+    RED = "red"
+
+
+class Product(Entity):
+    """Entity to model an entity with values that sqlite can't bind."""
+
+    price: Decimal
+    units: Decimal
+    color: Color
+    released: date
+    code: uuid.UUID
+
+
+def test_repo_stores_the_values_as_pypika_writes_them(
+    repo_pypika: PypikaRepository,
+) -> None:
+    """
+    Given: An entity with decimal, enum, date and uuid attributes
+    When: The entity is added
+    Then: The values are stored as pypika writes them in the queries, and the entity
+        can be read back
+    """
+    for table_name in ("product", "expected"):
+        repo_pypika.connection.execute(
+            f"CREATE TABLE {table_name} (id INTEGER PRIMARY KEY, price NUMERIC, "
+            "units NUMERIC, color VARCHAR(20), released DATE, code VARCHAR(36))"
+        )
+    product = Product(
+        id_=1,
+        price=Decimal("1.50"),
+        units=Decimal("2"),
+        color=Color.RED,
+        released=date(2020, 1, 1),
+        code=uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    )
+    data = product.dict()
+    data["id"] = data.pop("id_")
+    repo_pypika.connection.execute(
+        str(Query.into(Table("expected")).columns(*data.keys()).insert(*data.values()))
+    )
+
+    repo_pypika.add(product)  # act
+
+    stored_rows = [
+        repo_pypika.connection.execute(
+            f"SELECT {', '.join(data)} FROM {table_name}"  # noqa: S608
+        ).fetchall()
+        for table_name in ("product", "expected")
+    ]
+    assert stored_rows[0] == stored_rows[1]
+    assert repo_pypika.get(1, Product) == product
@@ -6,7 +6,7 @@ add them to the cases.
 
 import logging
 import os
-from typing import Any, List, Type
+from typing import Any, Iterator, List, Type
 
 import pytest
 from _pytest.logging import LogCaptureFixture
@@ -82,6 +82,54 @@ def test_repository_can_save_an_entity(
     assert entity == repo_tester.get_entity(database, entity)
 
 
+def test_repository_can_save_many_entities(
+    database: Any,
+    repo: Repository,
+    repo_tester: RepositoryTester[Repository],
+    entities: List[Entity],
+) -> None:
+    """
+    Given: An empty repository
+    When: adding many entities at once
+    Then: all the entities are saved
+    """
+    repo.add_many(entities)
+
+    repo.commit()  # act
+
+    assert repo_tester.get_all(database, type(entities[0])) == entities
+
+
+def test_repository_can_save_many_entities_without_id(
+    repo: Repository,
+    inserted_int_entity: Entity,
+) -> None:
+    """
+    Given: A repository with an entity whose id_ type is an int
+    When: adding many entities at once, some of them without id
+    Then: the ids of the new entities are set in order after the last one.
+    """
+    model = type(inserted_int_entity)
+    last_id = inserted_int_entity.id_
+    new_entities = [
+        model(name="First entity without id"),
+        # ignore: we know that the entities have an int id_
+        model(id_=last_id + 5, name="Entity with id"),  # type: ignore
+        model(name="Second entity without id"),
+    ]
+
+    repo.add_many(new_entities)  # act
+
+    # ignore: we know that the entities have an int id_
+    assert [entity.id_ for entity in new_entities] == [
+        last_id + 1,  # type: ignore
+        last_id + 5,  # type: ignore
+        last_id + 6,  # type: ignore
+    ]
+    repo.commit()
+    assert repo.all(model)[1:] == new_entities
+
+
 def test_repository_can_save_an_entity_without_id_in_empty_repo(
     repo: Repository,
     int_entity: Entity,
@@ -356,6 +404,21 @@ def test_repository_can_retrieve_all(
     assert result[0].id_ == inserted_entities[0].id_
 
 
+def test_repository_can_iterate_over_all(
+    repo: Repository,
+    inserted_entities: List[Entity],
+) -> None:
+    """
+    Given: A repository with inserted entities
+    When: iter_all is called
+    Then: all entities are returned one by one
+    """
+    result: Iterator[Entity] = repo.iter_all()
+
+    assert next(result) == inserted_entities[0]
+    assert list(result) == inserted_entities[1:]
+
+
 def test_repository_can_retrieve_all_objects_of_an_entity_type(
     repo: Repository,
     inserted_entities: List[Entity],
@@ -474,6 +537,38 @@ def test_repository_can_search_regular_expression(
     assert result == [expected_entity]
 
 
+def test_repository_can_iterate_over_a_search(
+    repo: Repository,
+    inserted_entities: List[Entity],
+) -> None:
+    """
+    Given: A repository with inserted entities
+    When: iter_search is called with a condition that one entity matches
+    Then: the matching entity is returned one by one
+    """
+    expected_entity = inserted_entities[1]
+
+    result = repo.iter_search({"id_": expected_entity.id_}, type(expected_entity))
+
+    assert list(result) == [expected_entity]
+
+
+def test_repository_iter_search_raises_error_if_no_entity_matches(
+    repo: Repository,
+    inserted_entities: List[Entity],
+) -> None:
+    """
+    Given: A repository with inserted entities
+    When: iter_search is called with a condition no entity matches
+    Then: the error is raised when requesting the first entity
+    """
+    entity = inserted_entities[0]
+    result = repo.iter_search({"id_": "inexistent_value"}, type(entity))
+
+    with pytest.raises(EntityNotFoundError):
+        next(result)
+
+
 def test_repository_search_raises_error_if_searching_by_inexistent_field(
     repo: Repository,
     inserted_entities: List[Entity],
@@ -527,6 +622,24 @@ def test_repository_can_search_by_multiple_properties(
     assert result == [entity]
 
 
+def test_repository_search_doesnt_return_entities_deleted_after_a_search(
+    repo: Repository,
+    inserted_entities: List[Entity],
+) -> None:
+    """
+    Given: a full repository where an entity has already been searched.
+    When: the entity is deleted and the search is repeated.
+    Then: the deleted entity is not returned.
+    """
+    entity = inserted_entities[1]
+    repo.search({"id_": entity.id_}, type(entity))
+    repo.delete(entity)
+    repo.commit()
+
+    with pytest.raises(EntityNotFoundError):
+        repo.search({"id_": entity.id_}, type(entity))
+
+
 @pytest.mark.skip(
     "Supported by Fake and TinyDB, not by Pypika yet. Once mappers are supported "
     "it should be easy to add this particular case."
@@ -566,6 +679,35 @@ def test_repository_can_delete_an_entity(
     assert entity_to_delete not in remaining_entities
 
 
+def test_repository_can_delete_many_entities(
+    repo: Repository,
+    inserted_entities: List[Entity],
+) -> None:
+    """
+    Given: a full repository.
+    When: many entities are deleted at once.
+    Then: the entities are not longer in the repository.
+    """
+    repo.delete_many(inserted_entities[:2])
+
+    repo.commit()  # act
+
+    assert repo.all(type(inserted_entities[0])) == inserted_entities[2:]
+
+
+def test_repository_delete_many_raise_error_if_an_entity_is_not_found(
+    repo: Repository,
+    entities: List[Entity],
+) -> None:
+    """
+    Given: an empty repository.
+    When: trying to delete many inexistent entities.
+    Then: An EntityNotFoundError error is raised.
+    """
+    with pytest.raises(EntityNotFoundError):
+        repo.delete_many(entities)
+
+
 @pytest.mark.secondary()
 def test_repository_doesnt_delete_the_entity_if_we_dont_commit(
     database: Any,
@@ -0,0 +1,199 @@
+"""Tests the behaviour specific to the TinyDBRepository."""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Tuple, Type
+
+import pytest
+from tinydb import TinyDB
+
+from repository_orm import Entity, TinyDBRepository
+
+from ..cases.model import Author, Genre
+
+
+def test_repo_moves_the_entities_of_the_legacy_table_to_their_tables(
+    db_tinydb: Tuple[str, TinyDB],
+) -> None:
+    """
+    Given: A database where all the entities are stored in the default table
+    When: The entities are read with the repository
+    Then: The entities are returned and moved to the table of their model
+    """
+    database_url, _ = db_tinydb
+    database_file = database_url.replace("tinydb:///", "")
+    author = Author(id_="author", name="Author name")
+    genre = Genre(id_=1, name="Genre name")
+    legacy_data = {
+        "_default": {
+            "1": {**author.dict(), "model_type_": "author"},
+            "2": {**genre.dict(), "model_type_": "genre"},
+        }
+    }
+    with open(database_file, "w") as file_cursor:
+        file_cursor.write(json.dumps(legacy_data))
+    models: List[Type[Entity]] = [Author, Genre]
+    repo = TinyDBRepository(database_url=database_url, models=models)
+
+    result: List[Entity] = repo.all()
+
+    assert result == [author, genre]
+    with open(database_file, "r") as file_cursor:
+        database = json.loads(file_cursor.read())
+    assert "_default" not in database
+    assert database["author"] == {"1": author.dict()}
+    assert database["genre"] == {"1": genre.dict()}
+
+
+def test_repo_doesnt_overwrite_the_entities_added_by_other_writer(
+    db_tinydb: Tuple[str, TinyDB],
+) -> None:
+    """
+    Given: A repository with a committed entity
+    When: Another repository adds an entity to the same database, and the first
+        repository commits a new entity
+    Then: All the entities are kept in the database
+    """
+    database_url, _ = db_tinydb
+    repo = TinyDBRepository(database_url=database_url, models=[Author])
+    other_repo = TinyDBRepository(database_url=database_url, models=[Author])
+    authors = [Author(id_=f"author_{index}", name="Author name") for index in range(3)]
+    repo.add(authors[0])
+    repo.commit()
+    other_repo.add(authors[1])
+    other_repo.commit()
+    repo.add(authors[2])
+
+    repo.commit()  # act
+
+    assert repo.all() == authors
+    assert TinyDBRepository(database_url=database_url, models=[Author]).all() == authors
+
+
+def test_repo_can_commit_while_iterating_the_entities(
+    db_tinydb: Tuple[str, TinyDB],
+) -> None:
+    """
+    Given: A repository with entities
+    When: Entities are added, deleted and committed while iterating over iter_all
+        and iter_search
+    Then: The iterators return the entities that were stored when they started
+    """
+    database_url, _ = db_tinydb
+    repo = TinyDBRepository(database_url=database_url, models=[Author])
+    authors = [Author(id_=f"author_{index}", name="Author") for index in range(2)]
+    new_authors = [Author(id_=f"{author.id_}_all", name="Author") for author in authors]
+    repo.add_many(authors)
+    repo.commit()
+    result: List[Author] = []
+
+    for author in repo.iter_all(Author):  # act
+        result.append(author)
+        repo.add(Author(id_=f"{author.id_}_all", name="Author"))
+        repo.commit()
+    for author in repo.iter_search({"name": "Author"}, Author):
+        result.append(author)
+        repo.delete(author)
+        repo.commit()
+
+    assert result == authors + authors + new_authors
+    assert repo.all(Author) == []
+
+
+class Mapping(Entity):
+    """Entity to model an entity with values that orjson can't serialize."""
+
+    names: Dict[int, str] = {}
+    big_number: int = 0
+    content: Any = None
+
+
+def test_repo_stores_entities_with_int_keys_and_big_numbers(
+    db_tinydb: Tuple[str, TinyDB],
+) -> None:
+    """
+    Given: An entity with a dictionary with integer keys and an integer bigger than
+        64 bits
+    When: The entity is committed
+    Then: The entity is stored and can be read back
+    """
+    database_url, _ = db_tinydb
+    repo = TinyDBRepository(database_url=database_url, models=[Mapping])
+    entity = Mapping(id_=1, names={1: "one"}, big_number=2**70)
+    repo.add(entity)
+
+    repo.commit()  # act
+
+    result = TinyDBRepository(database_url=database_url, models=[Mapping]).get(
+        1, Mapping
+    )
+    assert result == entity
+
+
+def test_repo_keeps_the_changes_staged_if_the_commit_fails(
+    db_tinydb: Tuple[str, TinyDB],
+) -> None:
+    """
+    Given: A repository with an entity staged that can't be serialized
+    When: The commit fails, the entity is fixed and the changes are committed again
+    Then: All the staged entities are stored
+    """
+    database_url, _ = db_tinydb
+    repo = TinyDBRepository(database_url=database_url, models=[Mapping])
+    entities = [Mapping(id_=1, content="content"), Mapping(id_=2, content=object())]
+    repo.add_many(entities)
+    with pytest.raises(TypeError):
+        repo.commit()
+    entities[1].content = "fixed content"
+
+    repo.commit()  # act
+
+    result = TinyDBRepository(database_url=database_url, models=[Mapping])
+    assert result.all() == entities
+
+
+class Event(Entity):
+    """Entity to model an entity with a datetime attribute."""
+
+    when: datetime
+
+
+def test_repo_reads_the_datetimes_of_models_it_wasnt_given(
+    db_tinydb: Tuple[str, TinyDB],
+) -> None:
+    """
+    Given: A database with an entity with datetimes stored by another repository
+    When: A repository whose models don't have datetimes gets the entity
+    Then: The datetimes are deserialized
+    """
+    database_url, _ = db_tinydb
+    event = Event(id_=1, when=datetime(2020, 1, 1))
+    other_repo = TinyDBRepository(database_url=database_url, models=[Event])
+    other_repo.add(event)
+    other_repo.commit()
+    repo = TinyDBRepository(database_url=database_url, models=[Author])
+
+    result = repo.get(1, Event)
+
+    assert result == event
+
+
+def test_repo_serializes_the_datetimes_of_models_it_wasnt_given(
+    db_tinydb: Tuple[str, TinyDB],
+) -> None:
+    """
+    Given: A repository whose models don't have datetimes
+    When: An entity with datetimes is committed
+    Then: The datetimes are stored serialized, so they're read back as datetimes
+    """
+    database_url, _ = db_tinydb
+    event = Event(id_=1, when=datetime(2020, 1, 1))
+    repo = TinyDBRepository(database_url=database_url, models=[Author])
+    repo.add(event)
+
+    repo.commit()  # act
+
+    with open(database_url.replace("tinydb:///", ""), "r") as file_cursor:
+        assert "{TinyDate}:2020-01-01T00:00:00" in file_cursor.read()
+    result = TinyDBRepository(database_url=database_url, models=[Event])
+    assert result.get(1, Event) == event
@@ -19,21 +19,19 @@ steps = [
     ),
     step(
         "CREATE TABLE book ("
-        "id INT, "
+        "id INTEGER PRIMARY KEY, "
         "name VARCHAR(20), "
         "summary VARCHAR(255), "
         "released DATETIME, "
-        "rating INT, "
-        "PRIMARY KEY (id))",
+        "rating INT)",
         "DROP TABLE book",
     ),
     step(
         "CREATE TABLE genre ("
-        "id INT, "
+        "id INTEGER PRIMARY KEY, "
         "name VARCHAR(20), "
         "description VARCHAR(255), "
-        "rating INT, "
-        "PRIMARY KEY (id))",
+        "rating INT)",
         "DROP TABLE genre",
     ),
     step(
@@ -47,18 +45,21 @@ steps = [
     ),
     step(
         "CREATE TABLE listentity ("
-        "id INT, "
+        "id INTEGER PRIMARY KEY, "
         "name VARCHAR(20), "
-        "description VARCHAR(255), "
-        "PRIMARY KEY (id))",
+        "description VARCHAR(255))",
         "DROP TABLE listentity",
     ),
     step(
         "CREATE TABLE listentity_has_elements ("
-        "id INT, "
+        "id INTEGER PRIMARY KEY, "
         "entity_id INT,"
-        "element VARCHAR(255), "
-        "PRIMARY KEY (id))",
+        "element VARCHAR(255))",
         "DROP TABLE listentity_has_elements",
     ),
+    step(
+        "CREATE INDEX listentity_has_elements_entity_id "
+        "ON listentity_has_elements (entity_id)",
+        "DROP INDEX listentity_has_elements_entity_id",
+    ),
 ]
@@ -1,28 +1,46 @@
 """Tests the model layer."""
 
+import operator
+from typing import Any, Callable
+
 import pytest
 
 from repository_orm import Entity
 
 
-def test_compare_less_than_entities() -> None:
+@pytest.mark.parametrize(
+    ("small_id", "big_id"),
+    [(1, 2), ("a", "b")],
+)
+@pytest.mark.parametrize(
+    ("operation", "expected"),
+    [(operator.lt, True), (operator.gt, False)],
+)
+def test_compare_entities(
+    small_id: Any,
+    big_id: Any,
+    operation: Callable[[Entity, Entity], bool],
+    expected: bool,
+) -> None:
     """Comparison between entities is done by the ID attribute."""
-    small = Entity(id_=1)
-    big = Entity(id_=2)
-
-    result = small < big
+    small = Entity(id_=small_id)
+    big = Entity(id_=big_id)
 
-    assert result
+    result = operation(small, big)
 
+    assert result == expected
 
-def test_compare_greater_than_entities() -> None:
-    """Comparison between entities is done by the ID attribute."""
-    small = Entity(id_=1)
-    big = Entity(id_=2)
 
-    result = big > small
+@pytest.mark.parametrize("operation", [operator.lt, operator.gt])
+def test_compare_entities_cant_compare_string_and_id(
+    operation: Callable[[Entity, Entity], bool],
+) -> None:
+    """Raise TypeError if one object id is a string and the other an int"""
+    entity_string = Entity(id_="a")
+    entity_int = Entity(id_=1)
 
-    assert result
+    with pytest.raises(TypeError):
+        operation(entity_string, entity_int)
 
 
 def test_hash_uses_the_entity_id() -> None:
@@ -49,41 +67,3 @@ def test_model_name_returns_expected_name() -> None:
     result = entity._model_name
 
     assert result == "Entity"
-
-
-def test_compare_less_than_entities_with_string_ids() -> None:
-    """Comparison between entities is done by the ID attribute on string IDS."""
-    small = Entity(id_="a")
-    big = Entity(id_="b")
-
-    result = small < big
-
-    assert result
-
-
-def test_compare_greater_than_entities_with_string_ids() -> None:
-    """Comparison between entities is done by the ID attribute on string IDS."""
-    small = Entity(id_="a")
-    big = Entity(id_="b")
-
-    result = big > small
-
-    assert result
-
-
-def test_compare_less_than_entities_cant_compare_string_and_id() -> None:
-    """Raise TypeError if one object id is a string and the other an int"""
-    entity_string = Entity(id_="a")
-    entity_int = Entity(id_=1)
-
-    with pytest.raises(TypeError):
-        entity_string < entity_int  # noqa: B015, W0104
-
-
-def test_compare_greater_than_entities_cant_compare_string_and_id() -> None:
-    """Raise TypeError if one object id is a string and the other an int"""
-    entity_string = Entity(id_="a")
-    entity_int = Entity(id_=1)
-
-    with pytest.raises(TypeError):
-        entity_string > entity_int  # noqa: B015, W0104